@@ -25,10 +25,17 @@
 #
 # =============================================================================
 
+import time
+
 import pychrono as chrono
 import pychrono.fea as fea
 import pychrono.irrlicht as chronoirr
 
+try:
+    import pychrono.pardisomkl as mklmodule  # optional, only if Chrono was built with the MKL module
+except ImportError:
+    mklmodule = None
+
 
 
 
@@ -38,9 +45,14 @@ chrono.SetChronoDataPath(CHRONO_DATA_DIR)
 
 # 1. Create the physical system that will handle all finite elements and constraints.
 
+#    No contacts happen here: the cylinder added below has collision enabled,
+#    but the cable has no contact surface and there is no other collision
+#    shape for it to touch, so the system only has finite elements and the
+#    two ChLinkPointFrame constraints. We use the ChSystemSMC: it does not carry
+#    the complementarity machinery that ChSystemNSC sets up at each step.
 #    Specify the gravitational acceleration vector, consistent with the
 #    global reference frame having Y up (ISO system).
-system = chrono.ChSystemNSC()
+system = chrono.ChSystemSMC()
 system.Set_G_acc(chrono.ChVectorD(0, -9.81, 0))
 
 
@@ -63,61 +75,31 @@ beam_material.SetYoungModulus(0.01e9)
 beam_material.SetBeamRaleyghDamping(0.01)
 
 
-# 4. Create the nodes
+# 4. and 5. Create the nodes and the elements
 
-#    - We use a simple for() loop to create nodes along the cable.
-#    - Nodes for ChElementCableANCF must be of ChNodeFEAxyzD class
+#    - The ChBuilderCableANCF helper creates, in a single call, the nodes
+#      evenly spaced between the two end points of the cable and the
+#      elements between consecutive nodes, and adds them all to the mesh.
+#    - Nodes for ChElementCableANCF are of ChNodeFEAxyzD class
 #      i.e. each node has 6 coordinates: position, direction, where
 #      direction is the tangent to the cable.
-#    - Each node must be added to the mesh, ex.  mesh.Add(my_node)
+#    - Each element is set with the ChBeamSectionCable material
+#      that we already created.
 #    - To make things easier in the following, we store node pointers
 #      into an optional 'beam_nodes' array, i.e. a std::vector<>, later we
-#      can use such array for easy creation of elements between the nodes.
-
-beam_nodes = []
+#      can use such array to attach the ends of the cable.
 
 length = 1.2  # beam length, in meters
 N_nodes = 16
-for i_ni in range(N_nodes)  :
-    # i-th node position
-    position = chrono.ChVectorD(length * (i_ni / (N_nodes - 1)),  # node position, x
-                                0.5,                                  # node position, y
-                                0)                                   # node position, z
-
-    # i-th node direction
-    direction = chrono.ChVectorD(1.0, 0, 0)
-
-    # create the node
-    node = fea.ChNodeFEAxyzD(position, direction)
-
-    # add it to mesh
-    mesh.AddNode(node)
-
-    # add it to the auxiliary beam_nodes
-    beam_nodes.append(node)
-
-
-
-# 5. Create the elements
 
-#    - We use a simple for() loop to create elements between the
-#      nodes that we already created.
-#    - Each element must be set with the ChBeamSectionCable material
-#      that we already created
-#    - Each element must be added to the mesh, ex.  mesh.Add(my_element)
+builder = fea.ChBuilderCableANCF()
+builder.BuildBeam(mesh,                              # the mesh where to put the created nodes and elements
+                  beam_material,                     # the ChBeamSectionCable to use for the elements
+                  N_nodes - 1,                       # the number of elements
+                  chrono.ChVectorD(0, 0.5, 0),       # the position of the first node
+                  chrono.ChVectorD(length, 0.5, 0))  # the position of the last node
 
-for ie in range(N_nodes - 1) :
-    # create the element
-    element = fea.ChElementCableANCF()
-
-    # set the connected nodes (pick two consecutive nodes in our beam_nodes container)
-    element.SetNodes(beam_nodes[ie], beam_nodes[ie + 1])
-
-    # set the material
-    element.SetSection(beam_material)
-
-    # add it to mesh
-    mesh.AddElement(element)
+beam_nodes = builder.GetLastBeamNodes()
 
 
 
@@ -193,10 +175,19 @@ system.Add(constraint_cyl)
 #   - Such triangle mesh can be rendered by Irrlicht or POVray or whatever
 #     postprocessor that can handle a coloured ChTriangleMeshShape).
 #   - Do not forget AddAsset() at the end!
+#   - Coloring the cable by axial strain means evaluating the strain at each
+#     vertex at every update. By default the cable surface is drawn in a
+#     plain color instead: set show_strain to True to see the strain.
+
+show_strain = False
 
 mvisualizebeamA = fea.ChVisualizationFEAmesh(mesh)
-mvisualizebeamA.SetFEMdataType(fea.ChVisualizationFEAmesh.E_PLOT_ANCF_BEAM_AX)
-mvisualizebeamA.SetColorscaleMinMax(-0.005, 0.005)
+if show_strain :
+    mvisualizebeamA.SetFEMdataType(fea.ChVisualizationFEAmesh.E_PLOT_ANCF_BEAM_AX)
+    mvisualizebeamA.SetColorscaleMinMax(-0.005, 0.005)
+else :
+    mvisualizebeamA.SetFEMdataType(fea.ChVisualizationFEAmesh.E_PLOT_SURFACE)
+mvisualizebeamA.SetFEMglyphType(fea.ChVisualizationFEAmesh.E_GLYPH_NONE)
 mvisualizebeamA.SetSmoothFaces(True)
 mvisualizebeamA.SetWireframe(False)
 mesh.AddAsset(mvisualizebeamA)
@@ -214,19 +205,36 @@ mesh.AddAsset(mvisualizebeamC)
 
 #    - the default SOLVER_SOR of Chrono is not able to manage stiffness matrices
 #      as required by FEA! we must switch to a different solver.
-#    - We pick the SOLVER_MINRES solver and we configure it.
-#    - Note that if you build the MKL module, you could use the more precise MKL solver.
+#    - If the MKL module is available we use the Pardiso direct solver: for
+#      this small cable, a direct factorization per Newton iteration is much
+#      cheaper than many MINRES iterations.
+#    - Otherwise we fall back to the SOLVER_MINRES solver and we configure it.
 
 # Change solver
-solver = chrono.ChSolverMINRES()
-solver.SetMaxIterations(200)
-solver.SetTolerance(1e-10)
-solver.EnableWarmStart(True)
+if mklmodule is not None:
+    solver = mklmodule.ChSolverPardisoMKL()
+    solver.LockSparsityPattern(True)
+else:
+    solver = chrono.ChSolverMINRES()
+    solver.SetMaxIterations(200)
+    solver.SetTolerance(1e-10)  # keep the HHT Newton corrections accurate
+    solver.EnableWarmStart(True)
 system.SetSolver(solver)
 
 # Change integrator:
-system.SetTimestepperType(chrono.ChTimestepper.Type_EULER_IMPLICIT_LINEARIZED)  # default: fast, 1st order
-# system.SetTimestepperType(ChTimestepper::Type::HHT)  # precise, slower, might iterate each step
+#    - HHT might iterate each step, but it stays stable with a larger step on
+#      this stiff cable, so fewer linear solves are needed per simulated second.
+# system.SetTimestepperType(chrono.ChTimestepper.Type_EULER_IMPLICIT_LINEARIZED)  # default: fast, 1st order
+system.SetTimestepperType(chrono.ChTimestepper.Type_HHT)  # precise, slower, might iterate each step
+stepper = chrono.CastToChTimestepperHHT(system.GetTimestepper())
+stepper.SetAlpha(-0.2)
+stepper.SetMaxiters(6)
+stepper.SetAbsTolerances(1e-5)
+stepper.SetScaling(True)
+
+# The system is complete and its topology will not change: set it up once
+# now, so the first steps do not have to.
+system.SetupInitial()
 
 
 # 9. Prepare visualization with Irrlicht
@@ -254,12 +262,30 @@ application.AssetUpdateAll()
 
 # 10. Perform the simulation.
 
-# Specify the step-size.
-application.SetTimestep(0.01)
-application.SetTryRealtime(True)
+# Specify the step-size, and how often a frame is rendered: there is no
+# need to redraw the scene after every physics step.
+#    - All the steps of a frame are run by the system in a single call to
+#      DoFrameDynamics(), so the Python loop only runs once per frame.
+#    - Since application.DoStep() is not used, some controls of the Irrlicht
+#      GUI have no effect here: the single step key while paused, the
+#      "real time" toggle and the time step setting. Pause still works, and
+#      real time is kept by the loop below.
+time_step = 0.02
+frame_interval = 0.04  # render at 25 Hz
 
+system.SetStep(time_step)
+
+# The Irrlicht device and video driver, and the placement and color of the
+# XZ grid, never change: get them only once.
+device = application.GetDevice()
+video_driver = application.GetVideoDriver()
+grid_csys = chrono.ChCoordsysD(chrono.ChVectorD(0, 0, 0), chrono.Q_from_AngX(chrono.CH_C_PI_2))
+grid_color = chronoirr.SColor(255, 80, 100, 100)
+
+
+while device.run() :
+    frame_start = time.perf_counter()
 
-while application.GetDevice().run() :
     # Initialize the graphical scene.
     application.BeginScene()
 
@@ -267,16 +293,20 @@ while application.GetDevice().run() :
     application.DrawAll()
 
     # Draw an XZ grid at the global origin to add in visualization.
-    chronoirr.drawGrid(application.GetVideoDriver(), 0.1, 0.1, 20, 20,
-                       chrono.ChCoordsysD(chrono.ChVectorD(0, 0, 0), chrono.Q_from_AngX(chrono.CH_C_PI_2)),
-                       chronoirr.SColor(255, 80, 100, 100), True)
+    chronoirr.drawGrid(video_driver, 0.1, 0.1, 20, 20, grid_csys, grid_color, True)
 
-    # Advance simulation by one step.
-    application.DoStep()
+    # Advance simulation by one frame interval (unless paused with the space bar).
+    if not application.GetPaused() :
+        if not system.DoFrameDynamics(system.GetChTime() + frame_interval) :
+            print("Simulation failed at time", system.GetChTime(), "- pausing.")
+            application.SetPaused(True)
 
     # Finalize the graphical scene.
     application.EndScene()
 
+    # Try to run in real time.
+    time.sleep(max(0.0, frame_interval - (time.perf_counter() - frame_start)))
+
 
 
 
@@ -60,7 +60,9 @@ system.Add(mesh)
 ## instead of ChElementCableANCF.
 ## The ChElementBeamEuler beams are more sophisticated as they can also
 ## simulate torsion and shear, and off-center shear effects.
-## Just use the same for() loops of the previous demo, but use these hints:
+## Just use the same for() loops as in FEA_cable_collide_1.cpp (the Python
+## version of the previous demo uses ChBuilderCableANCF instead of loops),
+## but use these hints:
 ## Hint: when creating the section material, in 3., remember that 
 ##       ChElementBeamEuler needs a ChBeamSectionAdvanced material.
 ## Hint: when creating the nodes, in 4., the nodes